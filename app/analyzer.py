@@ -4,31 +4,49 @@ Detects frameworks, CMS, analytics, and performs SEO analysis.
 """
 
 import re
+import os
 import json
-from bs4 import BeautifulSoup
+import hashlib
+from collections import OrderedDict
+from bs4 import BeautifulSoup, Doctype, FeatureNotFound
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, cached_property, partial
 from urllib.parse import urlparse
 from typing import Dict, List, Any
 import logging
 
+try:
+    import re2  # google-re2: linear-time matching, immune to backtracking blowups
+except ImportError:
+    re2 = None
+
+try:
+    from lxml import etree  # XPath count() evaluates entirely in libxml2 C
+except ImportError:
+    etree = None
+
 logger = logging.getLogger(__name__)
 
-# Technology detection patterns
+# Technology detection patterns.
+# NOTE: patterns must be written in lowercase — they are matched against a
+# pre-lowercased copy of the HTML, which is cheaper than scanning with
+# re.IGNORECASE for every pattern.
 TECH_PATTERNS = {
     "frameworks": {
         "React": [
             r'react(?:\.min)?\.js',
             r'react-dom',
-            r'__NEXT_DATA__',
+            r'__next_data__',
             r'data-reactroot',
-            r'_reactRootContainer',
-            r'__REACT_DEVTOOLS_GLOBAL_HOOK__'
+            r'_reactrootcontainer',
+            r'__react_devtools_global_hook__'
         ],
         "Vue.js": [
             r'vue(?:\.min)?\.js',
             r'v-app',
             r'data-v-[a-f0-9]',
-            r'__VUE__',
-            r'Vue\.component'
+            r'__vue__',
+            r'vue\.component'
         ],
         "Angular": [
             r'angular(?:\.min)?\.js',
@@ -38,13 +56,13 @@ TECH_PATTERNS = {
             r'\.ng-star-inserted'
         ],
         "Next.js": [
-            r'__NEXT_DATA__',
+            r'__next_data__',
             r'_next/static',
             r'next/dist',
-            r'NextJS'
+            r'nextjs'
         ],
         "Nuxt.js": [
-            r'__NUXT__',
+            r'__nuxt__',
             r'_nuxt/',
             r'nuxt-link'
         ],
@@ -60,7 +78,7 @@ TECH_PATTERNS = {
         ],
         "jQuery": [
             r'jquery(?:\.min)?\.js',
-            r'jQuery\(',
+            r'jquery\(',
             r'\$\(document\)'
         ],
         "Alpine.js": [
@@ -81,7 +99,7 @@ TECH_PATTERNS = {
         "Shopify": [
             r'cdn\.shopify\.com',
             r'shopify\.com',
-            r'Shopify\.theme',
+            r'shopify\.theme',
             r'myshopify\.com'
         ],
         "Wix": [
@@ -107,7 +125,7 @@ TECH_PATTERNS = {
         "Drupal": [
             r'drupal\.js',
             r'/sites/default/',
-            r'Drupal\.settings'
+            r'drupal\.settings'
         ],
         "Joomla": [
             r'/media/jui/',
@@ -119,23 +137,23 @@ TECH_PATTERNS = {
         "Tailwind CSS": [
             r'tailwindcss',
             r'tailwind\.min\.css',
-            r'class="[^"]*(?:flex|grid|bg-|text-|p-|m-|w-|h-)[^"]*"'
+            r'class="[^"]*?\b(?:flex|grid|bg-|text-|p-|m-|w-|h-)'
         ],
         "Bootstrap": [
             r'bootstrap(?:\.min)?\.(?:css|js)',
-            r'class="[^"]*(?:container|row|col-|btn-|navbar)[^"]*"'
+            r'class="[^"]*?\b(?:container|row|col-|btn-|navbar)'
         ],
         "Bulma": [
             r'bulma(?:\.min)?\.css',
-            r'class="[^"]*(?:is-|has-|columns|column)[^"]*"'
+            r'class="[^"]*?\b(?:is-|has-|columns|column)'
         ],
         "Foundation": [
             r'foundation(?:\.min)?\.(?:css|js)',
-            r'class="[^"]*(?:grid-x|cell|button)[^"]*"'
+            r'class="[^"]*?\b(?:grid-x|cell|button)'
         ],
         "Material UI": [
             r'@material-ui',
-            r'MuiButton',
+            r'muibutton',
             r'material-ui'
         ]
     },
@@ -145,12 +163,12 @@ TECH_PATTERNS = {
             r'googletagmanager\.com/gtag',
             r'gtag\(',
             r'ga\(',
-            r'UA-\d+-\d+'
+            r'ua-\d+-\d+'
         ],
         "Google Tag Manager": [
             r'googletagmanager\.com/gtm',
-            r'GTM-[A-Z0-9]+',
-            r'dataLayer'
+            r'gtm-[a-z0-9]+',
+            r'datalayer'
         ],
         "Facebook Pixel": [
             r'connect\.facebook\.net',
@@ -160,7 +178,7 @@ TECH_PATTERNS = {
         "Hotjar": [
             r'hotjar\.com',
             r'hj\(',
-            r'_hjSettings'
+            r'_hjsettings'
         ],
         "Microsoft Clarity": [
             r'clarity\.ms',
@@ -211,7 +229,7 @@ TECH_PATTERNS = {
     "libraries": {
         "Lodash": [r'lodash(?:\.min)?\.js'],
         "Moment.js": [r'moment(?:\.min)?\.js'],
-        "GSAP": [r'gsap', r'TweenMax', r'TweenLite'],
+        "GSAP": [r'gsap', r'tweenmax', r'tweenlite'],
         "Three.js": [r'three(?:\.min)?\.js'],
         "D3.js": [r'd3(?:\.min)?\.js', r'd3\.select'],
         "Chart.js": [r'chart(?:\.min)?\.js'],
@@ -224,7 +242,7 @@ TECH_PATTERNS = {
         "Google Fonts": [r'fonts\.googleapis\.com', r'fonts\.gstatic\.com']
     },
     "ecommerce": {
-        "Stripe": [r'stripe\.com', r'Stripe\('],
+        "Stripe": [r'stripe\.com', r'stripe\('],
         "PayPal": [r'paypal\.com', r'paypalobjects\.com'],
         "WooCommerce": [r'woocommerce', r'wc-'],
         "BigCommerce": [r'bigcommerce\.com'],
@@ -241,18 +259,170 @@ TECH_PATTERNS = {
 }
 
 
+@cache
+def _compiled_union(category: str):
+    """Compile one category's patterns for scanning, on demand.
+
+    Returns the category-wide alternation (one scan over the HTML instead of
+    one scan per pattern) plus a per-tech compiled alternation used to probe
+    each match position: the union alone reports only its first matching
+    branch, so techs sharing a fingerprint (e.g. __next_data__) or matching
+    at the same offset would be lost without the anchored probes.
+    Compilation is cached and lazy, so callers that never run
+    detect_technologies pay nothing.
+    """
+    parts = []
+    per_tech = []
+    for tech_name, patterns in TECH_PATTERNS[category].items():
+        parts.extend(f'(?:{p})' for p in patterns)
+        per_tech.append((tech_name, re.compile('|'.join(f'(?:{p})' for p in patterns))))
+    return re.compile('|'.join(parts)), per_tech
+
+
+@cache
+def _re2_set(category: str):
+    """Compile one category into an RE2 Set when google-re2 is available.
+
+    RE2 compiles all patterns of a category into one DFA and matches them in
+    a single linear-time scan, so hostile HTML can't trigger catastrophic
+    backtracking. Returns None when re2 is missing or a pattern is rejected,
+    in which case detection falls back to the stdlib union regex.
+    """
+    if re2 is None:
+        return None
+    try:
+        pattern_set = re2.Set.SearchSet()
+        group_names = []
+        for tech_name, patterns in TECH_PATTERNS[category].items():
+            for pattern in patterns:
+                pattern_set.Add(pattern)
+                group_names.append(tech_name)
+        pattern_set.Compile()
+        return pattern_set, group_names
+    except Exception as e:
+        logger.debug(f"re2 set compilation failed for {category}, using stdlib re: {e}")
+        return None
+
+# Inline data: URIs (base64 blobs) can be huge and never contain tech
+# fingerprints worth the scan time.
+_DATA_URI_RE = re.compile(r'data:[^"\')\s]+')
+
+# Pages above this size are scanned in parallel chunks; the overlap keeps
+# matches that straddle a chunk boundary from being missed.
+_PARALLEL_SCAN_THRESHOLD = 65536
+_SCAN_CHUNK_SIZE = 32768
+_SCAN_CHUNK_OVERLAP = 512
+
+# Display names used by generate_analysis_report
+CATEGORY_ICONS = {
+    'frameworks': '⚛️ Frameworks',
+    'cms': '📝 CMS',
+    'css_frameworks': '🎨 CSS Frameworks',
+    'analytics': '📈 Analytics',
+    'cdn': '🌐 CDN',
+    'libraries': '📚 Libraries',
+    'ecommerce': '🛒 E-commerce',
+    'hosting': '☁️ Hosting'
+}
+
+# Full-analysis memo keyed by (url, content digest): retries and
+# revalidations often feed the exact same page back in, and a hit skips
+# all of the regex and DOM work. blake2b is fast and fine for dedup.
+_ANALYSIS_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_ANALYSIS_CACHE_MAX = 32
+
+# Anchor hrefs for link triage — only the counts matter downstream.
+_ANCHOR_HREF_RE = re.compile(r'<a\b[^>]*?\bhref="([^"]*)"', re.IGNORECASE)
+
+
 class WebAnalyzer:
     """Analyzes web pages for technology stack and SEO metrics."""
     
     def __init__(self, html_content: str, url: str):
         self.html = html_content
         self.url = url
-        self.soup = BeautifulSoup(html_content, 'html.parser')
         self.domain = urlparse(url).netloc
+        # Anchored matcher for internal links: a bare `domain in href` check
+        # scans the whole URL and misclassifies e.g. ?target=example.com.
+        self._internal_link_re = re.compile(
+            r'^https?://(?:[^/@]*\.)?' + re.escape(self.domain) + r'(?:[/:?#]|$)',
+            re.IGNORECASE
+        )
+        self._meta_cache = None
+        self._scan_text_cache = None
+        self._img_stats_cache = None
+        self._ltree_cache = None
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        """Parsed DOM, built on first access.
+
+        Parsing is the most expensive step in the class; regex-only callers
+        (tech fingerprinting, cache hits) never pay for it.
+        """
+        try:
+            # C-backed parser: ~10x faster tree construction than html.parser
+            return BeautifulSoup(self.html, 'lxml')
+        except FeatureNotFound:
+            return BeautifulSoup(self.html, 'html.parser')
+
+    @property
+    def _ltree(self):
+        """lxml element tree for XPath-based counting, or None without lxml."""
+        if self._ltree_cache is None and etree is not None:
+            try:
+                self._ltree_cache = etree.HTML(self.html)
+            except Exception:
+                pass
+        return self._ltree_cache
+
+    @property
+    def _img_stats(self):
+        """Tally all <img> facts in one traversal: (total, with_alt, no_dims, lazy).
+
+        analyze_seo and get_performance_hints both need image counters;
+        computing them together avoids five separate passes over the tags.
+        """
+        if self._img_stats_cache is None:
+            tree = self._ltree
+            if tree is not None:
+                # Pure counts: let libxml2 do the walking in C.
+                total = int(tree.xpath('count(//img)'))
+                with_alt = int(tree.xpath("count(//img[@alt and normalize-space(@alt)!=''])"))
+                no_dims = int(tree.xpath('count(//img[not(@width) or not(@height)])'))
+                lazy = int(tree.xpath("count(//img[@loading='lazy'])"))
+            else:
+                total = with_alt = no_dims = lazy = 0
+                for img in self.soup.find_all('img'):
+                    total += 1
+                    if img.get('alt', '').strip():
+                        with_alt += 1
+                    if not img.get('width') or not img.get('height'):
+                        no_dims += 1
+                    if img.get('loading') == 'lazy':
+                        lazy += 1
+            self._img_stats_cache = (total, with_alt, no_dims, lazy)
+        return self._img_stats_cache
+
+    @property
+    def _scan_text(self) -> str:
+        """Lowercased HTML with data: URIs stripped, shared by all detectors."""
+        if self._scan_text_cache is None:
+            self._scan_text_cache = _DATA_URI_RE.sub('', self.html.lower())
+        return self._scan_text_cache
         
     def analyze(self) -> Dict[str, Any]:
         """Run full analysis and return results."""
-        return {
+        key = (self.url, hashlib.blake2b(
+            self.html.encode('utf-8', 'surrogatepass'), digest_size=16).digest())
+        cached = _ANALYSIS_CACHE.get(key)
+        if cached is not None:
+            _ANALYSIS_CACHE.move_to_end(key)
+            # Shallow copy so callers that tack extra keys onto the result
+            # (e.g. the cloner's quality report) don't pollute the cache.
+            return dict(cached)
+
+        result = {
             "url": self.url,
             "domain": self.domain,
             "technologies": self.detect_technologies(),
@@ -262,23 +432,70 @@ class WebAnalyzer:
             "structure": self.analyze_structure(),
             "performance_hints": self.get_performance_hints()
         }
+
+        _ANALYSIS_CACHE[key] = result
+        if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX:
+            _ANALYSIS_CACHE.popitem(last=False)
+        return dict(result)
     
+    def _category_matches(self, category: str, text: str) -> List[str]:
+        """Scan `text` for one category's patterns; sorted for determinism."""
+        found = set()
+        re2_entry = _re2_set(category)
+        if re2_entry is not None:
+            pattern_set, group_names = re2_entry
+            for idx in pattern_set.Match(text) or []:
+                found.add(group_names[idx])
+        else:
+            union, per_tech = _compiled_union(category)
+            total_techs = len(per_tech)
+            pos = 0
+            # Every tech in this category already matched — no point
+            # scanning the rest of the text.
+            while len(found) < total_techs:
+                m = union.search(text, pos)
+                if m is None:
+                    break
+                start = m.start()
+                # Probe each outstanding tech anchored at the match start,
+                # so co-located alternatives all surface instead of just
+                # the union's first branch
+                for tech_name, tech_re in per_tech:
+                    if tech_name not in found and tech_re.match(text, start):
+                        found.add(tech_name)
+                # Resume one char past the start (not the end) so shorter
+                # occurrences inside this match span aren't skipped
+                pos = start + 1
+        return sorted(found)
+
     def detect_technologies(self) -> Dict[str, List[str]]:
         """Detect all technologies used on the page."""
         detected = {}
-        html_lower = self.html.lower()
-        
-        for category, techs in TECH_PATTERNS.items():
-            found = []
-            for tech_name, patterns in techs.items():
-                for pattern in patterns:
-                    if re.search(pattern, self.html, re.IGNORECASE):
-                        if tech_name not in found:
-                            found.append(tech_name)
-                        break
-            if found:
-                detected[category] = found
-                
+        text = self._scan_text
+
+        if len(text) <= _PARALLEL_SCAN_THRESHOLD:
+            for category in TECH_PATTERNS:
+                found = self._category_matches(category, text)
+                if found:
+                    detected[category] = found
+            return detected
+
+        # Large pages: the scans are stateless over byte ranges and both re
+        # and re2 release the GIL while matching, so split into overlapping
+        # chunks and scan them across threads.
+        chunks = [
+            text[i:i + _SCAN_CHUNK_SIZE + _SCAN_CHUNK_OVERLAP]
+            for i in range(0, len(text), _SCAN_CHUNK_SIZE)
+        ]
+        workers = min(len(chunks), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for category in TECH_PATTERNS:
+                found = set()
+                for chunk_found in pool.map(partial(self._category_matches, category), chunks):
+                    found.update(chunk_found)
+                if found:
+                    detected[category] = sorted(found)
+
         return detected
     
     def analyze_seo(self) -> Dict[str, Any]:
@@ -289,105 +506,120 @@ class WebAnalyzer:
         canonical = self.soup.find('link', attrs={'rel': 'canonical'})
         robots = self.soup.find('meta', attrs={'name': 'robots'})
         
-        # Heading analysis
-        headings = {
-            f"h{i}": [h.get_text(strip=True)[:100] for h in self.soup.find_all(f'h{i}')]
-            for i in range(1, 7)
-        }
+        # Heading analysis (single traversal for all six levels). Only h1
+        # text appears in the report; for the rest a count is enough, so we
+        # skip the get_text subtree walk for them.
+        heading_counts = {f"h{i}": 0 for i in range(1, 7)}
+        h1_texts = []
+        for h in self.soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            heading_counts[h.name] += 1
+            if h.name == 'h1':
+                h1_texts.append(h.get_text(strip=True)[:100])
         
         # Image analysis
-        images = self.soup.find_all('img')
-        images_with_alt = sum(1 for img in images if img.get('alt', '').strip())
-        images_without_alt = len(images) - images_with_alt
+        total_images, images_with_alt, _, _ = self._img_stats
+        images_without_alt = total_images - images_with_alt
         
-        # Link analysis
-        links = self.soup.find_all('a', href=True)
-        internal_links = []
-        external_links = []
-        for link in links:
-            href = link['href']
+        # Link analysis — only counts are reported downstream, so one regex
+        # pass over the raw markup avoids materializing a Tag per anchor.
+        total_links = 0
+        internal_links = 0
+        external_links = 0
+        for m in _ANCHOR_HREF_RE.finditer(self.html):
+            href = m.group(1)
+            total_links += 1
             if href.startswith(('http://', 'https://')):
-                if self.domain in href:
-                    internal_links.append(href)
+                if self._internal_link_re.match(href):
+                    internal_links += 1
                 else:
-                    external_links.append(href)
+                    external_links += 1
             elif href.startswith('/'):
-                internal_links.append(href)
+                internal_links += 1
         
+        # Extract the hot strings once — get_text walks the node's subtree,
+        # and both the result dict and the scorer need them.
+        title_text = title.get_text(strip=True) if title else ''
+        desc_text = meta_desc.get('content', '') if meta_desc else ''
+
         # Calculate SEO score
         score = self._calculate_seo_score(
-            title, meta_desc, headings, images_with_alt, 
+            title_text, desc_text, heading_counts, images_with_alt,
             images_without_alt, canonical
         )
-        
+
         return {
             "score": score,
             "title": {
-                "content": title.get_text(strip=True) if title else None,
-                "length": len(title.get_text(strip=True)) if title else 0,
-                "optimal": 50 <= len(title.get_text(strip=True) if title else '') <= 60
+                "content": title_text or None,
+                "length": len(title_text),
+                "optimal": self._in_range(len(title_text), 50, 60)
             },
             "description": {
-                "content": meta_desc['content'] if meta_desc and meta_desc.get('content') else None,
-                "length": len(meta_desc.get('content', '')) if meta_desc else 0,
-                "optimal": 150 <= len(meta_desc.get('content', '') if meta_desc else '') <= 160
+                "content": desc_text or None,
+                "length": len(desc_text),
+                "optimal": self._in_range(len(desc_text), 150, 160)
             },
             "keywords": meta_keywords.get('content') if meta_keywords else None,
             "canonical": canonical['href'] if canonical else None,
             "robots": robots.get('content') if robots else None,
             "headings": {
-                "h1_count": len(headings['h1']),
-                "h1_content": headings['h1'],
-                "structure": {k: len(v) for k, v in headings.items()}
+                "h1_count": heading_counts['h1'],
+                "h1_content": h1_texts,
+                "structure": heading_counts
             },
             "images": {
-                "total": len(images),
+                "total": total_images,
                 "with_alt": images_with_alt,
                 "without_alt": images_without_alt,
-                "alt_percentage": round((images_with_alt / len(images) * 100) if images else 100, 1)
+                "alt_percentage": round((images_with_alt / total_images * 100) if total_images else 100, 1)
             },
             "links": {
-                "internal": len(internal_links),
-                "external": len(external_links),
-                "total": len(links)
+                "internal": internal_links,
+                "external": external_links,
+                "total": total_links
             }
         }
     
-    def _calculate_seo_score(self, title, meta_desc, headings, img_with_alt, img_without_alt, canonical) -> int:
+    @staticmethod
+    def _in_range(n: int, lo: int, hi: int) -> bool:
+        return lo <= n <= hi
+
+    def _calculate_seo_score(self, title_text: str, desc_text: str, heading_counts,
+                             img_with_alt: int, img_without_alt: int, canonical) -> int:
         """Calculate SEO score from 0-100."""
         score = 0
-        
+
         # Title (20 points)
-        if title:
-            title_len = len(title.get_text(strip=True))
-            if 50 <= title_len <= 60:
+        if title_text:
+            title_len = len(title_text)
+            if self._in_range(title_len, 50, 60):
                 score += 20
-            elif 30 <= title_len <= 70:
+            elif self._in_range(title_len, 30, 70):
                 score += 15
-            elif title_len > 0:
+            else:
                 score += 10
-        
+
         # Meta description (20 points)
-        if meta_desc and meta_desc.get('content'):
-            desc_len = len(meta_desc['content'])
-            if 150 <= desc_len <= 160:
+        if desc_text:
+            desc_len = len(desc_text)
+            if self._in_range(desc_len, 150, 160):
                 score += 20
-            elif 100 <= desc_len <= 200:
+            elif self._in_range(desc_len, 100, 200):
                 score += 15
-            elif desc_len > 0:
+            else:
                 score += 10
         
         # H1 (15 points)
-        h1_count = len(headings['h1'])
+        h1_count = heading_counts['h1']
         if h1_count == 1:
             score += 15
         elif h1_count > 1:
             score += 8
-        
+
         # Heading structure (10 points)
-        if len(headings['h2']) > 0:
+        if heading_counts['h2'] > 0:
             score += 5
-        if len(headings['h3']) > 0:
+        if heading_counts['h3'] > 0:
             score += 5
         
         # Images with alt (15 points)
@@ -409,31 +641,35 @@ class WebAnalyzer:
         
         return min(score, 100)
     
+    def _collect_meta(self):
+        """Walk all <meta> tags once and bucket them for both extractors."""
+        if self._meta_cache is None:
+            meta_tags = {}
+            og = {}
+            twitter = {}
+            for meta in self.soup.find_all('meta'):
+                name = meta.get('name', '')
+                prop = meta.get('property', '')
+                content = meta.get('content', '')
+
+                key = name or prop or meta.get('http-equiv')
+                if key and content:
+                    meta_tags[key] = content
+
+                if prop.startswith('og:'):
+                    og[prop.replace('og:', '')] = content
+                elif name.startswith('twitter:'):
+                    twitter[name.replace('twitter:', '')] = content
+            self._meta_cache = (meta_tags, og, twitter)
+        return self._meta_cache
+
     def extract_meta(self) -> Dict[str, str]:
         """Extract all meta tags."""
-        meta_tags = {}
-        for meta in self.soup.find_all('meta'):
-            name = meta.get('name') or meta.get('property') or meta.get('http-equiv')
-            content = meta.get('content')
-            if name and content:
-                meta_tags[name] = content
-        return meta_tags
-    
+        return self._collect_meta()[0]
+
     def extract_social_meta(self) -> Dict[str, Any]:
         """Extract Open Graph and Twitter Card data."""
-        og = {}
-        twitter = {}
-        
-        for meta in self.soup.find_all('meta'):
-            prop = meta.get('property', '')
-            name = meta.get('name', '')
-            content = meta.get('content', '')
-            
-            if prop.startswith('og:'):
-                og[prop.replace('og:', '')] = content
-            elif name.startswith('twitter:'):
-                twitter[name.replace('twitter:', '')] = content
-        
+        _, og, twitter = self._collect_meta()
         return {
             "open_graph": og,
             "twitter_card": twitter
@@ -441,30 +677,69 @@ class WebAnalyzer:
     
     def analyze_structure(self) -> Dict[str, Any]:
         """Analyze page structure."""
-        # Count elements
-        scripts = self.soup.find_all('script')
-        stylesheets = self.soup.find_all('link', rel='stylesheet')
-        inline_styles = self.soup.find_all('style')
-        
-        # Check for important elements
-        has_favicon = bool(self.soup.find('link', rel=lambda x: x and 'icon' in x))
-        has_viewport = bool(self.soup.find('meta', attrs={'name': 'viewport'}))
-        has_charset = bool(self.soup.find('meta', charset=True) or 
-                          self.soup.find('meta', attrs={'http-equiv': 'Content-Type'}))
-        
+        tree = self._ltree
+        if tree is not None:
+            # Counts and existence checks evaluate entirely in libxml2;
+            # no Python tag objects are materialized.
+            rel_token = "contains(concat(' ', normalize-space(@rel), ' '), ' {} ')"
+            return {
+                "scripts": {
+                    "external": int(tree.xpath('count(//script[@src])')),
+                    "inline": int(tree.xpath('count(//script[not(@src)])'))
+                },
+                "stylesheets": {
+                    "external": int(tree.xpath(f"count(//link[{rel_token.format('stylesheet')}])")),
+                    "inline": int(tree.xpath('count(//style)'))
+                },
+                "has_favicon": bool(tree.xpath(f"//link[{rel_token.format('icon')}]")),
+                "has_viewport": bool(tree.xpath("//meta[@name='viewport']")),
+                "has_charset": bool(tree.xpath("//meta[@charset] | //meta[@http-equiv='Content-Type']")),
+                "doctype": bool(tree.getroottree().docinfo.doctype)
+            }
+
+        # Fallback: tally everything in one BS4 traversal.
+        external_scripts = 0
+        inline_scripts = 0
+        stylesheets = 0
+        inline_styles = 0
+        has_favicon = False
+        has_viewport = False
+        has_charset = False
+
+        for tag in self.soup.find_all(['script', 'style', 'link', 'meta']):
+            name = tag.name
+            if name == 'script':
+                if tag.get('src'):
+                    external_scripts += 1
+                else:
+                    inline_scripts += 1
+            elif name == 'style':
+                inline_styles += 1
+            elif name == 'link':
+                rel = tag.get('rel') or []
+                if 'stylesheet' in rel:
+                    stylesheets += 1
+                if 'icon' in rel:
+                    has_favicon = True
+            else:  # meta
+                if tag.get('name') == 'viewport':
+                    has_viewport = True
+                if tag.get('charset') is not None or tag.get('http-equiv') == 'Content-Type':
+                    has_charset = True
+
         return {
             "scripts": {
-                "external": len([s for s in scripts if s.get('src')]),
-                "inline": len([s for s in scripts if not s.get('src')])
+                "external": external_scripts,
+                "inline": inline_scripts
             },
             "stylesheets": {
-                "external": len(stylesheets),
-                "inline": len(inline_styles)
+                "external": stylesheets,
+                "inline": inline_styles
             },
             "has_favicon": has_favicon,
             "has_viewport": has_viewport,
             "has_charset": has_charset,
-            "doctype": str(self.soup.contents[0]).startswith('<!DOCTYPE') if self.soup.contents else False
+            "doctype": bool(self.soup.contents and isinstance(self.soup.contents[0], Doctype))
         }
     
     def get_performance_hints(self) -> List[str]:
@@ -484,15 +759,12 @@ class WebAnalyzer:
                 hints.append("⚠️ Estilos inline grandes detectados - considerar archivo CSS externo")
                 break
         
-        # Check for images without dimensions
-        images = self.soup.find_all('img')
-        imgs_no_dims = [img for img in images if not img.get('width') or not img.get('height')]
-        if len(imgs_no_dims) > 5:
-            hints.append(f"⚠️ {len(imgs_no_dims)} imágenes sin dimensiones definidas (causa layout shift)")
-        
-        # Check for lazy loading
-        lazy_images = [img for img in images if img.get('loading') == 'lazy']
-        if len(images) > 5 and len(lazy_images) < len(images) * 0.5:
+        # Check for images without dimensions / lazy loading (shared pass)
+        total_images, _, imgs_no_dims, lazy_images = self._img_stats
+        if imgs_no_dims > 5:
+            hints.append(f"⚠️ {imgs_no_dims} imágenes sin dimensiones definidas (causa layout shift)")
+
+        if total_images > 5 and lazy_images < total_images * 0.5:
             hints.append("💡 Considera usar loading='lazy' en imágenes below-the-fold")
         
         return hints
@@ -500,8 +772,13 @@ class WebAnalyzer:
 
 def generate_analysis_report(analysis: Dict[str, Any]) -> str:
     """Generate a markdown report from analysis data."""
-    
-    report = f"""# 🔍 Web Analysis Report
+
+    # Accumulate fragments and join once at the end — repeated `report +=`
+    # reallocates the whole buffer on every append.
+    parts = []
+    w = parts.append
+
+    w(f"""# 🔍 Web Analysis Report
 
 **URL:** {analysis['url']}  
 **Domain:** {analysis['domain']}  
@@ -522,12 +799,12 @@ def generate_analysis_report(analysis: Dict[str, Any]) -> str:
 ### Heading Structure
 | Tag | Count |
 |-----|-------|
-"""
-    
+""")
+
     for tag, count in analysis['seo']['headings']['structure'].items():
-        report += f"| {tag.upper()} | {count} |\n"
-    
-    report += f"""
+        w(f"| {tag.upper()} | {count} |\n")
+
+    w(f"""
 ### Images
 - **Total:** {analysis['seo']['images']['total']}
 - **With Alt Text:** {analysis['seo']['images']['with_alt']} ✅
@@ -542,60 +819,49 @@ def generate_analysis_report(analysis: Dict[str, Any]) -> str:
 
 ## 🛠️ Technology Stack
 
-"""
-    
+""")
+
     tech = analysis['technologies']
-    category_icons = {
-        'frameworks': '⚛️ Frameworks',
-        'cms': '📝 CMS',
-        'css_frameworks': '🎨 CSS Frameworks',
-        'analytics': '📈 Analytics',
-        'cdn': '🌐 CDN',
-        'libraries': '📚 Libraries',
-        'ecommerce': '🛒 E-commerce',
-        'hosting': '☁️ Hosting'
-    }
-    
     for category, items in tech.items():
-        icon = category_icons.get(category, category.title())
-        report += f"### {icon}\n"
+        icon = CATEGORY_ICONS.get(category, category.title())
+        w(f"### {icon}\n")
         for item in items:
-            report += f"- {item}\n"
-        report += "\n"
-    
+            w(f"- {item}\n")
+        w("\n")
+
     if not tech:
-        report += "_No se detectaron tecnologías específicas_\n\n"
-    
+        w("_No se detectaron tecnologías específicas_\n\n")
+
     # Social Meta
-    report += """---
+    w("""---
 
 ## 🔗 Social Media Meta
 
 ### Open Graph
-"""
-    
+""")
+
     og = analysis['social']['open_graph']
     if og:
         for key, value in og.items():
-            report += f"- **{key}:** {value[:100]}{'...' if len(value) > 100 else ''}\n"
+            w(f"- **{key}:** {value[:100]}{'...' if len(value) > 100 else ''}\n")
     else:
-        report += "_No Open Graph tags found_\n"
-    
-    report += "\n### Twitter Card\n"
+        w("_No Open Graph tags found_\n")
+
+    w("\n### Twitter Card\n")
     twitter = analysis['social']['twitter_card']
     if twitter:
         for key, value in twitter.items():
-            report += f"- **{key}:** {value[:100]}{'...' if len(value) > 100 else ''}\n"
+            w(f"- **{key}:** {value[:100]}{'...' if len(value) > 100 else ''}\n")
     else:
-        report += "_No Twitter Card tags found_\n"
-    
+        w("_No Twitter Card tags found_\n")
+
     # Performance hints
     if analysis['performance_hints']:
-        report += "\n---\n\n## ⚡ Performance Hints\n\n"
+        w("\n---\n\n## ⚡ Performance Hints\n\n")
         for hint in analysis['performance_hints']:
-            report += f"- {hint}\n"
-    
-    report += """
+            w(f"- {hint}\n")
+
+    w("""
 ---
 
 ## 📁 File Structure
@@ -616,6 +882,6 @@ output/
 ---
 
 _Generated by **Web Cloner Elite** - The professional web cloning tool_
-"""
-    
-    return report
+""")
+
+    return "".join(parts)
@@ -3,12 +3,37 @@ import os
 import re
 import json
 import hashlib
+from functools import lru_cache
+from pathlib import Path
 from urllib.parse import urljoin, urlparse, unquote
 from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
+from bs4.element import Tag
 import aiofiles
 import logging
 
+try:
+    # Lexbor parses and serializes in C, 10-20x faster than BS4 for the
+    # find-and-rewrite workload in process_page.
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    # Direct HTTP downloads instead of funnelling every asset through the
+    # browser's CDP channel.
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+try:
+    # Non-cryptographic hash for filename disambiguation; 5-10x faster
+    # than MD5 and collision-safe enough for this purpose
+    import xxhash
+except ImportError:
+    xxhash = None
+
 from app.analyzer import WebAnalyzer, generate_analysis_report
 from app.validator import ResourceValidator
 from app.optimizer import ResourceOptimizer
@@ -19,37 +44,147 @@ from app.quality import QualityScorer
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# url(...) references inside stylesheets
+_CSS_URL_RE = re.compile(r'url\(["\']?([^"\')\s]+)["\']?\)')
+
+# Asset-type triage for CSS url() targets: one regex pass each instead of
+# N substring scans per URL
+_FONT_EXT_RE = re.compile(r'\.(woff2?|ttf|otf)(\?|$)', re.I)
+_IMG_EXT_RE = re.compile(r'\.(jpe?g|png|svg|webp|gif)(\?|$)', re.I)
+
+_KNOWN_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico',
+               '.css', '.js', '.woff', '.woff2', '.ttf')
+
+# Assets above this are videos/archives we don't want in a clone anyway
+MAX_ASSET_BYTES = 10 * 1024 * 1024
+
+
+@lru_cache(maxsize=4096)
+def _sanitize_filename(url: str, default_ext: str = '') -> str:
+    """Generate a clean, readable filename (memoized; CDN URLs repeat)."""
+    parsed = urlparse(url)
+    path = unquote(parsed.path)
+    filename = os.path.basename(path)
+
+    if not filename or len(filename) > 100:
+        if xxhash is not None:
+            hash_part = xxhash.xxh64(url.encode()).hexdigest()[:8]
+        else:
+            hash_part = hashlib.md5(url.encode()).hexdigest()[:8]
+        filename = f"resource_{hash_part}{default_ext}"
+
+    filename = re.sub(r'[^\w\-_\.]', '_', filename)
+
+    if default_ext and not filename.lower().endswith(_KNOWN_EXTS):
+        filename += default_ext
+
+    return filename
+
+
+# --- Parser-agnostic node helpers -------------------------------------------
+# The asset processors run against either a BS4 soup or a Lexbor tree; both
+# answer CSS selectors (soup.select via soupsieve, tree.css via lexbor), and
+# these helpers paper over the small attribute-API differences.
+
+def _query(root, selector):
+    """CSS query against a BS4 soup or a Lexbor tree."""
+    if isinstance(root, BeautifulSoup):
+        return root.select(selector)
+    return root.css(selector)
+
+
+def _tag_get(node, name, default=None):
+    """Read an attribute from a BS4 tag or Lexbor node."""
+    if isinstance(node, Tag):
+        value = node.get(name, default)
+        if isinstance(value, list):
+            value = ' '.join(value)
+    else:
+        value = node.attributes.get(name, default)
+    return value if value is not None else default
+
+
+def _tag_set(node, name, value):
+    """Set an attribute on a BS4 tag or Lexbor node."""
+    if isinstance(node, Tag):
+        node[name] = value
+    else:
+        node.attrs[name] = value
+
+
+def _tag_del(node, name):
+    """Remove an attribute if present."""
+    if isinstance(node, Tag):
+        if node.has_attr(name):
+            del node[name]
+    elif name in node.attributes:
+        del node.attrs[name]
+
+
+def _tag_text(node):
+    """Inline text content of a node ('' when empty)."""
+    if isinstance(node, Tag):
+        return node.string or ''
+    return node.text() or ''
+
 
 class ClonerPro:
     """Professional web cloner with organized output structure and quality assurance."""
-    
+
+    # One alternation, one scan per string (vs. 13 separate regex passes)
+    _TRACKER_RE = re.compile(
+        r'facebook|google-analytics|googletagmanager|gtag|hotjar|tiktok'
+        r'|clarity\.ms|segment\.com|mixpanel|amplitude|intercom|crisp\.chat|hubspot',
+        re.I
+    )
+
     def __init__(self, url, job_id, output_base_dir="downloads"):
         self.url = url
         self.job_id = job_id
-        self.output_dir = os.path.join(output_base_dir, job_id)
-        
+        self.output_dir = Path(output_base_dir) / job_id
+
         # Professional folder structure
+        assets = self.output_dir / "assets"
         self.dirs = {
-            'images': os.path.join(self.output_dir, "assets", "images"),
-            'fonts': os.path.join(self.output_dir, "assets", "fonts"),
-            'icons': os.path.join(self.output_dir, "assets", "icons"),
-            'css': os.path.join(self.output_dir, "css"),
-            'js': os.path.join(self.output_dir, "js"),
+            'images': assets / "images",
+            'fonts': assets / "fonts",
+            'icons': assets / "icons",
+            'css': self.output_dir / "css",
+            'js': self.output_dir / "js",
         }
-        
+
         # Ensure directories exist
         for dir_path in self.dirs.values():
             os.makedirs(dir_path, exist_ok=True)
         
-        # Track downloaded resources to avoid duplicates
-        self.downloaded = set()
+        # Final saved path per canonical URL; doubles as the dedupe set
+        self.downloaded = {}
+        # In-flight downloads keyed by canonical URL; concurrent requests
+        # for the same asset await the first task's future
+        self._inflight = {}
+        # HEAD probe results per canonical URL (dead links, oversized files)
+        self._head_cache = {}
+        # (filename, bytes) per saved image; lets the quality pass skip a
+        # second stat() sweep over the images directory
+        self.image_meta = []
         self.analysis_data = None
+
+        # Cap concurrent downloads; asset fetches run in parallel batches
+        self._sem = asyncio.Semaphore(16)
+
+        # Shared HTTP session (created lazily, closed in capture_site)
+        self._session = None
         
         # Helpers
         self.fallback_manager = FallbackManager()
         self.validator = ResourceValidator()
         self.optimizer = ResourceOptimizer()
-        
+
+        # Prefer the Lexbor engine when selectolax is installed
+        self.use_lexbor = LexborHTMLParser is not None
+
     async def capture_site(self):
         """Main capture process."""
         logger.info(f"🚀 Starting capture for {self.url} (Job ID: {self.job_id})")
@@ -57,21 +192,42 @@ class ClonerPro:
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
             context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                user_agent=USER_AGENT,
                 viewport={'width': 1920, 'height': 1080},
                 locale="en-US"
             )
             
+            # Abort heavyweight media, fonts and tracker requests up front;
+            # assets are fetched separately, so this only speeds up capture
+            async def block_nonessential(route):
+                request = route.request
+                if request.resource_type in ('media', 'font') or self._TRACKER_RE.search(request.url):
+                    await route.abort()
+                else:
+                    await route.continue_()
+
+            await context.route('**/*', block_nonessential)
+
             page = await context.new_page()
-            
+
             try:
                 # 1. Navigate with extended timeout
                 logger.info("📡 Navigating to URL...")
-                await page.goto(self.url, wait_until="networkidle", timeout=120000)
+                await page.goto(self.url, wait_until="domcontentloaded", timeout=120000)
+
+                # Best-effort settle; third-party beacons shouldn't hold
+                # the capture hostage for the full timeout
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=15000)
+                except Exception:
+                    pass
                 
                 # 2. Auto-scroll for lazy loading
                 logger.info("📜 Auto-scrolling to trigger lazy load...")
                 await self.auto_scroll(page)
+
+                # 2.1 Share the browser's cookies with the download session
+                await self._sync_cookies(context)
                 
                 # 3. Get fully rendered HTML
                 content = await page.content()
@@ -83,15 +239,18 @@ class ClonerPro:
                 
                 # 5. Process and download all assets
                 logger.info("📥 Processing and downloading assets...")
-                cleaned_html = await self.process_page(page, content)
+                cleaned_html = await self.process_page(
+                    page, content,
+                    parsed=None if self.use_lexbor else analyzer.soup
+                )
                 
                 # 6. Save index.html
-                async with aiofiles.open(os.path.join(self.output_dir, "index.html"), "w", encoding="utf-8") as f:
+                async with aiofiles.open(self.output_dir / "index.html", "w", encoding="utf-8") as f:
                     await f.write(cleaned_html)
                 
                 # 7. Run Quality Assurance
                 logger.info("🌟 Running Quality Assurance...")
-                scorer = QualityScorer(self.output_dir)
+                scorer = QualityScorer(self.output_dir, image_meta=self.image_meta)
                 quality_data = await scorer.analyze_quality()
                 self.analysis_data['quality'] = quality_data
                 
@@ -105,6 +264,8 @@ class ClonerPro:
                 logger.error(f"❌ Error capturing site: {e}")
                 raise e
             finally:
+                if self._session is not None:
+                    await self._session.close()
                 await browser.close()
     
     async def auto_scroll(self, page):
@@ -130,135 +291,282 @@ class ClonerPro:
         """)
         await page.wait_for_timeout(1500)
     
-    async def process_page(self, page, html_content):
-        """Process HTML and download all assets."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
+    async def process_page(self, page, html_content, parsed=None):
+        """Process HTML and download all assets.
+
+        ``parsed`` lets the caller hand over an already-built soup (the
+        analyzer parses the same document first) so the BS4 path doesn't
+        pay for a second full parse.
+        """
+        if self.use_lexbor:
+            root = LexborHTMLParser(html_content)
+        elif parsed is not None:
+            root = parsed
+        else:
+            try:
+                # C-backed parser; ~10x faster tree construction on big pages
+                root = BeautifulSoup(html_content, 'lxml')
+            except Exception:
+                root = BeautifulSoup(html_content, 'html.parser')
+
         # 1. Remove trackers
-        self.remove_trackers(soup)
-        
+        self.remove_trackers(root)
+
         # 2. Neutralize forms
-        self.neutralize_forms(soup)
+        self.neutralize_forms(root)
 
         # 2.1 Remove base tag to force local resolution
-        for base in soup.find_all('base'):
+        for base in _query(root, 'base'):
             base.decompose()
-        
+
         # 3. Download and rewrite images
-        await self.process_images(page, soup)
-        
+        await self.process_images(page, root)
+
         # 4. Download and rewrite CSS
-        await self.process_css(page, soup)
-        
+        await self.process_css(page, root)
+
         # 5. Download and rewrite JS (optional scripts)
-        await self.process_js(page, soup)
-        
+        await self.process_js(page, root)
+
         # 6. Download fonts referenced in CSS
-        await self.process_fonts(page, soup)
-        
+        await self.process_fonts(page, root)
+
         # 7. Download favicon and icons
-        await self.process_icons(page, soup)
-        
+        await self.process_icons(page, root)
+
         # 8. Clean inline styles with external URLs
-        self.clean_inline_styles(soup)
-        
-        return str(soup)
+        self.clean_inline_styles(root)
+
+        if self.use_lexbor:
+            # Lexbor serializes in C
+            return root.html
+        # Default minimal formatter: BS4 unescapes entities while parsing,
+        # so serializing without re-escaping would emit raw < and & in text
+        return root.decode()
     
-    def remove_trackers(self, soup):
+    def remove_trackers(self, root):
         """Remove tracking scripts and pixels."""
-        trackers = [
-            re.compile(r'facebook', re.I),
-            re.compile(r'google-analytics', re.I),
-            re.compile(r'googletagmanager', re.I),
-            re.compile(r'gtag', re.I),
-            re.compile(r'hotjar', re.I),
-            re.compile(r'tiktok', re.I),
-            re.compile(r'clarity\.ms', re.I),
-            re.compile(r'segment\.com', re.I),
-            re.compile(r'mixpanel', re.I),
-            re.compile(r'amplitude', re.I),
-            re.compile(r'intercom', re.I),
-            re.compile(r'crisp\.chat', re.I),
-            re.compile(r'hubspot', re.I),
-        ]
-        
-        for t in trackers:
-            # Script src
-            for s in soup.find_all('script', src=t): s.decompose()
-            # Iframe src
-            for i in soup.find_all('iframe', src=t): i.decompose()
-        
-        # Inline scripts
-        for script in soup.find_all('script', src=False):
-            if script.string and any(t.search(script.string) for t in trackers):
-                script.decompose()
+        # One traversal: match on src for external tags, body for inline ones
+        for node in _query(root, 'script, iframe'):
+            target = _tag_get(node, 'src', '') or _tag_text(node)
+            if target and self._TRACKER_RE.search(target):
+                node.decompose()
 
-    def neutralize_forms(self, soup):
+    def neutralize_forms(self, root):
         """Neutralize all forms."""
-        forms = soup.find_all('form')
-        for form in forms:
-            form['action'] = '#'
-            form['method'] = 'GET'
-            form['onsubmit'] = 'event.preventDefault(); return false;'
+        for form in _query(root, 'form'):
+            _tag_set(form, 'action', '#')
+            _tag_set(form, 'method', 'GET')
+            _tag_set(form, 'onsubmit', 'event.preventDefault(); return false;')
     
+    def _record_image(self, path):
+        """Remember a saved image's size for the quality pass."""
+        try:
+            self.image_meta.append((os.path.basename(path), os.path.getsize(path)))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _canonical_url(url):
+        """Normalize a URL so duplicate fetches collapse onto one key."""
+        parsed = urlparse(url.split('#', 1)[0])
+        return parsed._replace(netloc=parsed.netloc.lower()).geturl()
+
     async def download_resource(self, page, url, save_path, resource_type='auto'):
-        """Smart download with Validation, Fallback, and Optimization."""
-        if url in self.downloaded:
-            return True
-        
+        """Smart download with Validation, Fallback, and Optimization.
+
+        Returns the final saved path (optimization may change the
+        extension, e.g. JPEG/PNG to WebP) or False on failure.
+        """
+        canon = self._canonical_url(url)
+        if canon in self.downloaded:
+            return self.downloaded[canon]
+
+        inflight = self._inflight.get(canon)
+        if inflight is not None:
+            # Another task already owns this URL; share its outcome
+            return await inflight
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[canon] = future
+
+        result = False
         try:
-            # 1. Try Primary Download
-            content = await self._fetch_content(page, url)
-            
-            # 2. Fallback if failed
-            if not content:
+            result = await self._do_download(page, url, canon, save_path, resource_type)
+        except Exception as e:
+            logger.warning(f"⚠️ Error downloading {url}: {e}")
+        finally:
+            self._inflight.pop(canon, None)
+            future.set_result(result)
+        return result
+
+    async def _do_download(self, page, url, canon, save_path, resource_type):
+        """Fetch, validate, save and optimize a single resource."""
+        # Large binaries stream straight to disk; text assets still buffer
+        # because validation and minification need the whole body
+        if aiohttp is not None and resource_type in ('image', 'font'):
+            streamed = await self._stream_download(url, save_path, resource_type)
+            if not streamed:
                 cdn_url = self.fallback_manager.get_cdn_url(url)
                 if cdn_url:
                     logger.info(f"🔄 Trying CDN fallback for {url}")
-                    content = await self._fetch_content(page, cdn_url)
-            
-            if not content:
+                    streamed = await self._stream_download(cdn_url, save_path, resource_type)
+            if not streamed:
                 logger.warning(f"❌ Failed to download {url} (Refusing content)")
-                # Final rescue: Create placeholder?
-                # Dependent on strictness. For now return False to trigger logic placeholders if needed.
                 return False
 
-            # 3. Validate
-            is_valid = True
             if resource_type == 'image':
-                is_valid = self.validator.is_valid_image(content, url)
-            elif resource_type == 'css':
-                is_valid = self.validator.is_valid_css(content)
-            elif resource_type == 'js':
-                is_valid = self.validator.is_valid_js(content)
-            
-            if not is_valid:
-                logger.warning(f"⚠️ Validation failed for {url} ({resource_type})")
-                return False
+                save_path = await self.optimizer.optimize_image(save_path) or save_path
+                self._record_image(save_path)
+            self.downloaded[canon] = save_path
+            return save_path
 
-            # 4. Save & Optimize
-            self.downloaded.add(url)
-            
-            # Save temp for optimization
-            async with aiofiles.open(save_path, "wb") as f:
-                await f.write(content)
-                
-            # Optimize in place
-            if resource_type == 'image':
-                await self.optimizer.optimize_image(save_path)
-            elif resource_type == 'css':
-                await self.optimizer.minify_css(save_path)
-            elif resource_type == 'js':
-                await self.optimizer.minify_js(save_path)
-                
+        # 1. Try Primary Download
+        content = await self._fetch_content(page, url)
+
+        # 2. Fallback if failed
+        if not content:
+            cdn_url = self.fallback_manager.get_cdn_url(url)
+            if cdn_url:
+                logger.info(f"🔄 Trying CDN fallback for {url}")
+                content = await self._fetch_content(page, cdn_url)
+
+        if not content:
+            logger.warning(f"❌ Failed to download {url} (Refusing content)")
+            # Final rescue: Create placeholder?
+            # Dependent on strictness. For now return False to trigger logic placeholders if needed.
+            return False
+
+        # 3. Validate
+        is_valid = True
+        if resource_type == 'image':
+            is_valid = self.validator.is_valid_image(content, url)
+        elif resource_type == 'css':
+            is_valid = self.validator.is_valid_css(content)
+        elif resource_type == 'js':
+            is_valid = self.validator.is_valid_js(content)
+
+        if not is_valid:
+            logger.warning(f"⚠️ Validation failed for {url} ({resource_type})")
+            return False
+
+        # 4. Save & Optimize
+        # Save temp for optimization
+        async with aiofiles.open(save_path, "wb") as f:
+            await f.write(content)
+
+        # Optimize in place
+        if resource_type == 'image':
+            save_path = await self.optimizer.optimize_image(save_path) or save_path
+            self._record_image(save_path)
+        elif resource_type == 'css':
+            await self.optimizer.minify_css(save_path)
+        elif resource_type == 'js':
+            await self.optimizer.minify_js(save_path)
+
+        self.downloaded[canon] = save_path
+        return save_path
+
+    async def _head_probe(self, url):
+        """Cheap HEAD check; False means the GET isn't worth attempting."""
+        canon = self._canonical_url(url)
+        cached = self._head_cache.get(canon)
+        if cached is not None:
+            return cached
+
+        ok = True
+        try:
+            async with self._get_session().head(
+                url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status >= 400:
+                    ok = False
+                elif int(response.headers.get('Content-Length', 0)) > MAX_ASSET_BYTES:
+                    logger.info(f"⏭️ Skipping oversized asset {url}")
+                    ok = False
+        except Exception:
+            # Some servers reject HEAD entirely; let the GET decide
+            ok = True
+
+        self._head_cache[canon] = ok
+        return ok
+
+    async def _stream_download(self, url, save_path, resource_type):
+        """Stream a response to disk, sniffing the first chunk before committing."""
+        if not await self._head_probe(url):
+            return False
+
+        try:
+            async with self._get_session().get(url) as response:
+                if response.status != 200:
+                    return False
+                if (response.content_length or 0) > MAX_ASSET_BYTES:
+                    return False
+
+                chunks = response.content.iter_chunked(65536)
+                first = b''
+                async for chunk in chunks:
+                    first = chunk
+                    break
+                if not first:
+                    return False
+
+                # Magic-number sniff on the head before writing anything
+                if resource_type == 'image' and not self.validator.is_valid_image(first, url):
+                    logger.warning(f"⚠️ Validation failed for {url} ({resource_type})")
+                    return False
+
+                async with aiofiles.open(save_path, "wb") as f:
+                    await f.write(first)
+                    written = len(first)
+                    async for chunk in chunks:
+                        written += len(chunk)
+                        if written > MAX_ASSET_BYTES:
+                            # Server didn't declare a length; cap it ourselves
+                            raise ValueError(f"{url} exceeds {MAX_ASSET_BYTES} bytes")
+                        await f.write(chunk)
             return True
+        except Exception:
+            # Don't leave a half-written file behind
+            if os.path.exists(save_path):
+                os.unlink(save_path)
+            return False
+
+    def _get_session(self):
+        """Lazily create the shared aiohttp session."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, limit_per_host=8),
+                headers={'User-Agent': USER_AGENT},
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+        return self._session
 
+    async def _sync_cookies(self, context):
+        """Copy the browser context's cookies into the download session."""
+        if aiohttp is None:
+            return
+        try:
+            session = self._get_session()
+            for cookie in await context.cookies():
+                session.cookie_jar.update_cookies(
+                    {cookie['name']: cookie['value']},
+                    response_url=URL(f"https://{cookie['domain'].lstrip('.')}/")
+                )
         except Exception as e:
-            logger.warning(f"⚠️ Error downloading {url}: {e}")
-            return False
+            logger.warning(f"⚠️ Could not sync cookies to download session: {e}")
 
     async def _fetch_content(self, page, url):
         """Raw fetch helper."""
+        if aiohttp is not None:
+            try:
+                async with self._get_session().get(url) as response:
+                    if response.status == 200:
+                        return await response.read()
+            except Exception:
+                pass
+            return None
+        # Fallback: route through the browser's request API
         try:
             response = await page.request.get(url, timeout=30000)
             if response.status == 200:
@@ -269,133 +577,174 @@ class ClonerPro:
 
     def sanitize_filename(self, url: str, default_ext: str = '') -> str:
         """Generate a clean, readable filename."""
-        parsed = urlparse(url)
-        path = unquote(parsed.path)
-        filename = os.path.basename(path)
-        
-        if not filename or len(filename) > 100:
-            hash_part = hashlib.md5(url.encode()).hexdigest()[:8]
-            filename = f"resource_{hash_part}{default_ext}"
-        
-        filename = re.sub(r'[^\w\-_\.]', '_', filename)
-        
-        if default_ext and not any(filename.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.css', '.js', '.woff', '.woff2', '.ttf']):
-            filename += default_ext
-        
-        return filename
+        return _sanitize_filename(url, default_ext)
     
-    async def process_images(self, page, soup):
+    async def _bounded_download(self, page, url, save_path, resource_type):
+        """download_resource gated by the shared concurrency semaphore."""
+        async with self._sem:
+            return await self.download_resource(page, url, save_path, resource_type)
+
+    async def process_images(self, page, root):
         """Download images."""
-        for img in soup.find_all('img', src=True):
-            src = img.get('src', '').strip()
+        jobs = []
+        for img in _query(root, 'img[src]'):
+            src = _tag_get(img, 'src', '').strip()
             if not src or src.startswith('data:'): continue
-            
+
             absolute_url = urljoin(self.url, src)
             filename = self.sanitize_filename(absolute_url, '.jpg')
-            save_path = os.path.join(self.dirs['images'], filename)
-            
-            success = await self.download_resource(page, absolute_url, save_path, 'image')
-            
-            if success:
-                img['src'] = f"assets/images/{filename}"
-                if img.has_attr('srcset'): del img['srcset']
-                if img.has_attr('data-src'): del img['data-src']
+            save_path = self.dirs['images'] / filename
+            jobs.append((img, filename,
+                         self._bounded_download(page, absolute_url, save_path, 'image')))
+
+        results = await asyncio.gather(*(coro for _, _, coro in jobs))
+
+        for (img, filename, _), result in zip(jobs, results):
+            if result:
+                # Optimization may have changed the extension (e.g. .webp)
+                _tag_set(img, 'src', f"assets/images/{os.path.basename(result)}")
+                _tag_del(img, 'srcset')
+                _tag_del(img, 'data-src')
             else:
                 # Fallback placeholder?
                 # img['src'] = "assets/images/placeholder.svg"
                 pass  # Keep original src or broken link? Better broken than fake sometimes, but we promised quality.
                 # Let's leave it for now to avoid altering layout too much if we don't have a good placeholder
 
-    async def process_css(self, page, soup):
+    async def process_css(self, page, root):
         """Download CSS."""
-        for link in soup.find_all('link', rel="stylesheet", href=True):
-            href = link.get('href', '').strip()
+        jobs = []
+        for link in _query(root, 'link[rel~="stylesheet"][href]'):
+            href = _tag_get(link, 'href', '').strip()
             if not href: continue
-            
+
             absolute_url = urljoin(self.url, href)
             filename = self.sanitize_filename(absolute_url, '.css')
-            save_path = os.path.join(self.dirs['css'], filename)
-            
-            if await self.download_resource(page, absolute_url, save_path, 'css'):
-                # Process internal URLs
-                await self.process_css_urls(page, save_path, absolute_url)
-                link['href'] = f"css/{filename}"
+            save_path = self.dirs['css'] / filename
+            jobs.append((link, filename,
+                         self._fetch_stylesheet(page, absolute_url, save_path)))
+
+        results = await asyncio.gather(*(coro for _, _, coro in jobs))
+
+        for (link, filename, _), success in zip(jobs, results):
+            if success:
+                _tag_set(link, 'href', f"css/{filename}")
+
+    async def _fetch_stylesheet(self, page, absolute_url, save_path):
+        """Download one stylesheet and localize the URLs inside it."""
+        async with self._sem:
+            success = await self.download_resource(page, absolute_url, save_path, 'css')
+        if success:
+            # Process internal URLs
+            await self.process_css_urls(page, save_path, absolute_url)
+        return success
 
     async def process_css_urls(self, page, css_path: str, base_url: str):
         """Process URLs inside CSS files."""
         try:
-            async with aiofiles.open(css_path, 'r', encoding='utf-8', errors='ignore') as f:
-                css_content = await f.read()
-            
-            urls = re.findall(r'url\(["\']?([^"\')\s]+)["\']?\)', css_content)
-            modified = False
+            # Single-shot read; the aiofiles threadpool hop costs more than
+            # the read itself for files this size
+            with open(css_path, 'r', encoding='utf-8', errors='ignore') as f:
+                css_content = f.read()
             
-            for url_match in urls:
+            jobs = []
+            seen = set()
+            for url_match in _CSS_URL_RE.findall(css_content):
                 if url_match.startswith('data:') or url_match.startswith('#'): continue
-                
+                if url_match in seen: continue
+                seen.add(url_match)
+
                 absolute_url = urljoin(base_url, url_match)
-                
+
                 # Determine type
                 filename = self.sanitize_filename(absolute_url)
-                if any(x in url_match.lower() for x in ['.woff', '.ttf', '.otf']):
-                    save_path = os.path.join(self.dirs['fonts'], filename)
-                    rel_path = f"../assets/fonts/{filename}"
+                if _FONT_EXT_RE.search(url_match):
+                    save_path = self.dirs['fonts'] / filename
+                    rel_dir = "../assets/fonts"
                     rtype = 'font'
-                elif any(x in url_match.lower() for x in ['.jpg', '.png', '.svg']):
-                    save_path = os.path.join(self.dirs['images'], filename)
-                    rel_path = f"../assets/images/{filename}"
+                elif _IMG_EXT_RE.search(url_match):
+                    save_path = self.dirs['images'] / filename
+                    rel_dir = "../assets/images"
                     rtype = 'image'
                 else:
                     continue
-                
-                if await self.download_resource(page, absolute_url, save_path, rtype):
-                    css_content = css_content.replace(url_match, rel_path)
-                    modified = True
-            
-            if modified:
-                async with aiofiles.open(css_path, 'w', encoding='utf-8') as f:
-                    await f.write(css_content)
+
+                jobs.append((url_match, rel_dir,
+                             self._bounded_download(page, absolute_url, save_path, rtype)))
+
+            results = await asyncio.gather(*(coro for _, _, coro in jobs))
+            mapping = {u: f"{rel_dir}/{os.path.basename(result)}"
+                       for (u, rel_dir, _), result in zip(jobs, results) if result}
+
+            if mapping:
+                # One linear pass, scoped to url(...) contexts only
+                css_content = _CSS_URL_RE.sub(
+                    lambda m: f'url({mapping[m.group(1)]})' if m.group(1) in mapping else m.group(0),
+                    css_content
+                )
+                with open(css_path, 'w', encoding='utf-8') as f:
+                    f.write(css_content)
         except Exception:
             pass
 
-    async def process_js(self, page, soup):
+    async def process_js(self, page, root):
         """Download JS."""
         trackers = ['google', 'facebook', 'analytics', 'gtag', 'hotjar']
-        
-        for script in soup.find_all('script', src=True):
-            src = script.get('src', '').strip()
+
+        jobs = []
+        for script in _query(root, 'script[src]'):
+            src = _tag_get(script, 'src', '').strip()
             if not src or any(t in src.lower() for t in trackers): continue
-            
+
             absolute_url = urljoin(self.url, src)
             filename = self.sanitize_filename(absolute_url, '.js')
-            save_path = os.path.join(self.dirs['js'], filename)
-            
-            if await self.download_resource(page, absolute_url, save_path, 'js'):
-                script['src'] = f"js/{filename}"
+            save_path = self.dirs['js'] / filename
+            jobs.append((script, filename,
+                         self._bounded_download(page, absolute_url, save_path, 'js')))
+
+        results = await asyncio.gather(*(coro for _, _, coro in jobs))
 
-    async def process_fonts(self, page, soup):
-        for link in soup.find_all('link', rel="preload", href=True):
-            if link.get('as') == 'font':
-                href = link.get('href', '').strip()
+        for (script, filename, _), success in zip(jobs, results):
+            if success:
+                _tag_set(script, 'src', f"js/{filename}")
+
+    async def process_fonts(self, page, root):
+        jobs = []
+        for link in _query(root, 'link[rel~="preload"][href]'):
+            if _tag_get(link, 'as') == 'font':
+                href = _tag_get(link, 'href', '').strip()
                 absolute_url = urljoin(self.url, href)
                 filename = self.sanitize_filename(absolute_url, '.woff2')
-                save_path = os.path.join(self.dirs['fonts'], filename)
-                
-                if await self.download_resource(page, absolute_url, save_path, 'font'):
-                    link['href'] = f"assets/fonts/{filename}"
-
-    async def process_icons(self, page, soup):
-        icon_rels = ['icon', 'shortcut icon', 'apple-touch-icon']
-        for link in soup.find_all('link', href=True):
-            if any(r in (link.get('rel') or []) for r in icon_rels):
-                href = link.get('href', '').strip()
+                save_path = self.dirs['fonts'] / filename
+                jobs.append((link, filename,
+                             self._bounded_download(page, absolute_url, save_path, 'font')))
+
+        results = await asyncio.gather(*(coro for _, _, coro in jobs))
+
+        for (link, filename, _), success in zip(jobs, results):
+            if success:
+                _tag_set(link, 'href', f"assets/fonts/{filename}")
+
+    async def process_icons(self, page, root):
+        icon_rels = {'icon', 'apple-touch-icon'}
+        jobs = []
+        for link in _query(root, 'link[href]'):
+            rel_tokens = set(_tag_get(link, 'rel', '').lower().split())
+            if rel_tokens & icon_rels:
+                href = _tag_get(link, 'href', '').strip()
                 absolute_url = urljoin(self.url, href)
                 filename = self.sanitize_filename(absolute_url, '.ico')
-                save_path = os.path.join(self.dirs['icons'], filename)
-                if await self.download_resource(page, absolute_url, save_path, 'image'):
-                    link['href'] = f"assets/icons/{filename}"
+                save_path = self.dirs['icons'] / filename
+                jobs.append((link, filename,
+                             self._bounded_download(page, absolute_url, save_path, 'image')))
+
+        results = await asyncio.gather(*(coro for _, _, coro in jobs))
 
-    def clean_inline_styles(self, soup):
+        for (link, filename, _), result in zip(jobs, results):
+            if result:
+                _tag_set(link, 'href', f"assets/icons/{os.path.basename(result)}")
+
+    def clean_inline_styles(self, root):
         pass # Optional cleanup
 
     async def generate_reports(self, scorer):
@@ -411,11 +760,27 @@ class ClonerPro:
         # Combine
         full_report = report_md + "\n\n" + quality_md
         
-        async with aiofiles.open(os.path.join(self.output_dir, "ANALYSIS.md"), "w", encoding="utf-8") as f:
-            await f.write(full_report)
-        
-        async with aiofiles.open(os.path.join(self.output_dir, "analysis.json"), "w", encoding="utf-8") as f:
-            await f.write(json.dumps(self.analysis_data, indent=2, ensure_ascii=False))
+        # One-off writes at the tail of the capture; sync open is cheaper
+        # than bouncing through the aiofiles threadpool
+        with open(self.output_dir / "ANALYSIS.md", "w", encoding="utf-8") as f:
+            f.write(full_report)
+
+        with open(self.output_dir / "analysis.json", "w", encoding="utf-8") as f:
+            json.dump(self.analysis_data, f, indent=2, ensure_ascii=False)
         
     def get_analysis(self) -> dict:
         return self.analysis_data
+
+    def archive_entries(self):
+        """(abs_path, arcname) pairs for every file this job wrote.
+
+        Lets the ZIP step skip re-walking the output tree; self.downloaded
+        already holds the final path of each saved asset.
+        """
+        entries = {}
+        for path in self.downloaded.values():
+            if path:
+                entries[os.path.relpath(path, self.output_dir)] = path
+        for name in ("index.html", "ANALYSIS.md", "analysis.json"):
+            entries[name] = self.output_dir / name
+        return [(path, arcname) for arcname, path in entries.items()]
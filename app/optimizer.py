@@ -2,134 +2,229 @@
 Resource Optimizer Module
 Optimizes images, CSS, and JS for production-ready performance.
 """
+import asyncio
+import concurrent.futures
 import logging
 import os
-import aiofiles
 import re
+import shutil
+import subprocess
 
 logger = logging.getLogger(__name__)
 
-class ResourceOptimizer:
-    """Optimizes web resources."""
-    
-    @staticmethod
-    async def optimize_image(input_path: str, output_path: str = None) -> bool:
-        """Compress and optimize images using Pillow."""
-        if not output_path:
-            output_path = input_path
-            
+# esbuild (Go, internally parallel) wins on big bundles when it's on PATH
+_ESBUILD = shutil.which('esbuild')
+_ESBUILD_THRESHOLD = 100 * 1024
+
+try:
+    # libjpeg-turbo encode: SIMD DCT and no second Huffman pass, unlike
+    # Pillow's optimize=True. Needs the system libturbojpeg, so failure to
+    # import or bind just leaves the Pillow path in place.
+    import numpy as np
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _TURBO_JPEG = TurboJPEG()
+except Exception:
+    _TURBO_JPEG = None
+
+# CPU-bound work (Pillow decode/resize/encode, csscompressor) runs in a
+# process pool so it doesn't stall the asyncio loop mid-download. Celery
+# prefork workers are daemonized and can't spawn children, so the first
+# failed submit swaps the pool for threads.
+_POOL = None
+_POOL_KIND = None
+
+
+def _get_pool(kind='process'):
+    global _POOL, _POOL_KIND
+    if _POOL is None or _POOL_KIND != kind:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False)
+        if kind == 'process':
+            _POOL = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+        else:
+            _POOL = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+        _POOL_KIND = kind
+    return _POOL
+
+
+async def _run_offloaded(func, *args):
+    """Run a sync function in the shared pool, degrading to threads if needed."""
+    loop = asyncio.get_running_loop()
+    if _POOL_KIND != 'thread':
         try:
-            from PIL import Image
-            
-            # Open image
-            with Image.open(input_path) as img:
-                
-                # Convert RGBA to RGB for JPEG compatibility if needed
-                if img.mode == 'RGBA' and output_path.lower().endswith(('.jpg', '.jpeg')):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])
-                    img = background
-                
-                # Resize if massive (> 2500px)
-                max_dimension = 2500
-                if max(img.size) > max_dimension:
-                    ratio = max_dimension / max(img.size)
-                    new_size = tuple(int(dim * ratio) for dim in img.size)
-                    img = img.resize(new_size, Image.Resampling.LANCZOS)
-                
-                # Save optimized
-                save_kwargs = {'optimize': True}
-                
-                if output_path.lower().endswith(('.jpg', '.jpeg')):
-                    save_kwargs['quality'] = 80
-                    img.save(output_path, 'JPEG', **save_kwargs)
-                    
-                elif output_path.lower().endswith('.png'):
-                    # PNG compression level (default is 6, max 9)
-                    save_kwargs['compress_level'] = 9 
-                    img.save(output_path, 'PNG', **save_kwargs)
-                    
-                elif output_path.lower().endswith('.webp'):
-                    save_kwargs['quality'] = 80
-                    img.save(output_path, 'WEBP', **save_kwargs)
-                else:
-                    # Just save if format not specially handled
-                    img.save(output_path)
-                    
-            return True
+            return await loop.run_in_executor(_get_pool('process'), func, *args)
         except Exception as e:
-            logger.warning(f"⚠️ Image optimization failed for {os.path.basename(input_path)}: {e}")
-            return False
-    
-    @staticmethod
-    async def minify_css(input_path: str, output_path: str = None) -> bool:
-        """Minify CSS content."""
-        if not output_path:
-            output_path = input_path
-            
+            logger.info(f"Process pool unavailable ({e}), falling back to threads")
+    return await loop.run_in_executor(_get_pool('thread'), func, *args)
+
+
+def _optimize_image_sync(input_path: str, output_path: str) -> str:
+    """Compress one image, preferring WebP output (runs in the worker pool).
+
+    Returns the path of the file actually written, or '' on failure.
+    """
+    # Callers may hand over pathlib.Paths; the suffix checks below need str
+    input_path = os.fspath(input_path)
+    output_path = os.fspath(output_path)
+    try:
+        from PIL import Image
+
+        lowered = output_path.lower()
+
+        # Pass through SVG (PIL can't decode it) and tiny files, where the
+        # WebP container overhead eats the savings
+        if lowered.endswith('.svg') or os.path.getsize(input_path) < 4096:
+            return input_path
+
+        with Image.open(input_path) as img:
+            img.load()
+
+            # Resize if massive (> 2500px)
+            max_dimension = 2500
+            if max(img.size) > max_dimension:
+                ratio = max_dimension / max(img.size)
+                new_size = tuple(int(dim * ratio) for dim in img.size)
+                img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+            if lowered.endswith(('.jpg', '.jpeg', '.png', '.webp')):
+                # Same visual quality, 25-50% fewer bytes than JPEG-80/PNG-9
+                final_path = os.path.splitext(output_path)[0] + '.webp'
+                try:
+                    if img.mode not in ('RGB', 'RGBA'):
+                        img = img.convert('RGBA')
+                    img.save(final_path, 'WEBP', quality=80, method=6)
+                except Exception:
+                    # Pillow without WebP support: re-encode the original format
+                    final_path = output_path
+                    _save_original_format(img, output_path, lowered)
+            else:
+                # Just save if format not specially handled
+                img.save(output_path)
+                final_path = output_path
+
+        if final_path != input_path and os.path.exists(input_path):
+            os.remove(input_path)
+        return final_path
+    except Exception as e:
+        logger.warning(f"⚠️ Image optimization failed for {os.path.basename(input_path)}: {e}")
+        return ''
+
+
+def _save_original_format(img, output_path, lowered):
+    """JPEG/PNG encode used when WebP output isn't available."""
+    from PIL import Image
+
+    if lowered.endswith(('.jpg', '.jpeg')):
+        # Convert RGBA to RGB for JPEG compatibility if needed
+        if img.mode == 'RGBA':
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[3])
+            img = background
+        if _TURBO_JPEG is not None:
+            rgb = img if img.mode == 'RGB' else img.convert('RGB')
+            encoded = _TURBO_JPEG.encode(np.asarray(rgb), pixel_format=TJPF_RGB, quality=80)
+            with open(output_path, 'wb') as f:
+                f.write(encoded)
+        else:
+            img.save(output_path, 'JPEG', quality=80, optimize=True)
+    else:
+        # PNG compression level (default is 6, max 9)
+        img.save(output_path, 'PNG', compress_level=9, optimize=True)
+
+
+def _minify_css_sync(input_path: str, output_path: str) -> bool:
+    """Minify one CSS file (runs in the worker pool)."""
+    input_path = os.fspath(input_path)
+    output_path = os.fspath(output_path)
+    try:
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        minified = None
         try:
-            import csscompressor
-            
-            async with aiofiles.open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = await f.read()
-            
-            minified = csscompressor.compress(content)
-            
-            if minified and len(minified) < len(content):
-                async with aiofiles.open(output_path, 'w', encoding='utf-8') as f:
-                    await f.write(minified)
-                return True
-                
+            # Single-pass state machine in C; string-aware, so quoted
+            # url() values and content strings survive intact
+            import rcssmin
+            minified = rcssmin.cssmin(content)
         except ImportError:
-            logger.warning("csscompressor not installed, skipping minification")
-        except Exception as e:
-            logger.warning(f"⚠️ CSS minification failed: {e}")
-            
-            # Fallback: simple regex minification
             try:
-                async with aiofiles.open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = await f.read()
-                
-                # Remove comments
+                import csscompressor
+                minified = csscompressor.compress(content)
+            except ImportError:
+                logger.warning("rcssmin/csscompressor not installed, skipping minification")
+
+        if minified and len(minified) < len(content):
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(minified)
+            return True
+
+    except Exception as e:
+        logger.warning(f"⚠️ CSS minification failed: {e}")
+
+    return False
+
+
+def _minify_js_sync(input_path: str, output_path: str) -> bool:
+    """Minify one JS file (runs in the worker pool)."""
+    input_path = os.fspath(input_path)
+    output_path = os.fspath(output_path)
+    try:
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        compact = None
+
+        if _ESBUILD and len(content) > _ESBUILD_THRESHOLD:
+            try:
+                proc = subprocess.run(
+                    [_ESBUILD, '--minify', '--loader=js'],
+                    input=content.encode('utf-8'),
+                    capture_output=True, timeout=30
+                )
+                if proc.returncode == 0 and proc.stdout:
+                    compact = proc.stdout.decode('utf-8', 'ignore')
+            except Exception:
+                compact = None
+
+        if compact is None:
+            try:
+                # Tokenizing minifier, safe around strings and regex literals
+                import rjsmin
+                compact = rjsmin.jsmin(content)
+            except ImportError:
+                # Last resort: strip block comments only. We DONT remove line
+                # breaks to avoid breaking missing-semicolon code
                 compact = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-                # Collapse whitespace
-                compact = re.sub(r'\s+', ' ', compact)
-                # Remove spaces around punctuation
-                compact = re.sub(r'\s*([:;{}])\s*', r'\1', compact)
-                
-                async with aiofiles.open(output_path, 'w', encoding='utf-8') as f:
-                    await f.write(compact)
-                return True
-            except:
-                pass
-                
-        return False
+
+        # Only save if we actually reduced size
+        if compact and len(compact) < len(content):
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(compact)
+            return True
+
+    except Exception as e:
+        logger.warning(f"⚠️ JS cleanup failed: {e}")
+
+    return False
+
+
+class ResourceOptimizer:
+    """Optimizes web resources."""
+
+    @staticmethod
+    async def optimize_image(input_path: str, output_path: str = None) -> str:
+        """Compress an image, converting JPEG/PNG to WebP when possible.
+
+        Returns the final file path ('' if optimization failed).
+        """
+        return await _run_offloaded(_optimize_image_sync, input_path, output_path or input_path)
+
+    @staticmethod
+    async def minify_css(input_path: str, output_path: str = None) -> bool:
+        """Minify CSS content."""
+        return await _run_offloaded(_minify_css_sync, input_path, output_path or input_path)
 
     @staticmethod
     async def minify_js(input_path: str, output_path: str = None) -> bool:
         """Simple JS minification/cleanup."""
-        if not output_path:
-            output_path = input_path
-            
-        try:
-            async with aiofiles.open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = await f.read()
-            
-            # Very basic minification safety: just remove big comment blocks and excessive whitespace
-            # Full JS minification is risky without a parser like Terser, so we play it safe
-            
-            # Remove multi-line comments
-            compact = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-            
-            # We DONT remove line breaks in JS to avoid breaking missing semicolon code
-            
-            # Only save if we actually reduced size
-            if len(compact) < len(content):
-                async with aiofiles.open(output_path, 'w', encoding='utf-8') as f:
-                    await f.write(compact)
-                return True
-                
-        except Exception as e:
-            logger.warning(f"⚠️ JS cleanup failed: {e}")
-            
-        return False
+        return await _run_offloaded(_minify_js_sync, input_path, output_path or input_path)
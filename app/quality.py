@@ -2,17 +2,53 @@
 Quality Assurance Module
 Analyzes downloaded templates for quality and generates certification reports.
 """
+import asyncio
 import os
-import aiofiles
+import re
 import logging
+from collections import Counter
 
 logger = logging.getLogger(__name__)
 
+try:
+    # Vectorized size thresholding for image stats; the pure-Python loop
+    # below remains the fallback
+    import numpy as np
+except ImportError:
+    np = None
+
+# Every HTML quality signal in one alternation: a single scan of
+# index.html replaces eight str.count/in passes
+_HTML_SCAN_RE = re.compile(r'src=""|href=""|google-analytics|fbq\(|gtag\(')
+_TRACER_TOKENS = ('google-analytics', 'fbq(', 'gtag(')
+
+# Score weighting per category (must sum to 1.0)
+_WEIGHTS = (('html', 0.4), ('css', 0.3), ('images', 0.3))
+
+
+# HTML smuggled into a .css file shows up in the first few KB
+_HTML_SNIFF_RE = re.compile(rb'<html|<!doctype', re.IGNORECASE)
+
+
+def _read_text(path: str) -> str:
+    """Plain sync read; called through asyncio.to_thread."""
+    with open(path, 'r', errors='ignore') as f:
+        return f.read()
+
+
+def _read_head(path: str, size: int = 4096) -> bytes:
+    """Read just the first `size` bytes of a file."""
+    with open(path, 'rb') as f:
+        return f.read(size)
+
 class QualityScorer:
     """Evaluates the quality of a cloned site."""
     
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, image_meta=None):
         self.output_dir = output_dir
+        # (filename, bytes) pairs recorded by the cloner at download time;
+        # when provided, check_images skips the directory sweep entirely
+        self.image_meta = image_meta
         self.score = {
             'overall': 0,
             'images': {'score': 0, 'issues': []},
@@ -22,42 +58,63 @@ class QualityScorer:
     
     async def analyze_quality(self) -> dict:
         """Run full quality analysis."""
-        await self.check_images()
-        await self.check_css()
-        await self.check_html()
+        # The checks touch disjoint directories and write to separate
+        # self.score keys, so they can overlap freely
+        await asyncio.gather(self.check_images(), self.check_css(), self.check_html())
         self.calculate_overall_score()
         return self.score
     
     async def check_images(self):
         """Analyze image assets."""
-        images_dir = os.path.join(self.output_dir, 'assets', 'images')
-        
-        if not os.path.exists(images_dir):
-            self.score['images']['score'] = 100 # No images is technically valid
-            self.score['images']['stats'] = {'total': 0, 'broken': 0, 'oversized': 0, 'total_size_mb': 0}
-            return
-        
-        total = 0
-        broken = 0
-        oversized = 0
-        current_size = 0
-        
-        for f in os.listdir(images_dir):
-            path = os.path.join(images_dir, f)
-            if not os.path.isfile(path): continue
-            
-            total += 1
-            size = os.path.getsize(path)
-            current_size += size
-            
-            if size > 1_500_000: # > 1.5MB
-                oversized += 1
-                self.score['images']['issues'].append(f"Heavy image: {f} ({size/1024/1024:.1f}MB)")
-                
-            # Basic integrity check
-            if size < 100: # Suspiciously small
-                broken += 1
-                self.score['images']['issues'].append(f"Corrupt/Empty image: {f}")
+        if self.image_meta is not None:
+            # Sizes were captured as the cloner wrote each file — CPU-only
+            metas = self.image_meta
+        else:
+            images_dir = os.path.join(self.output_dir, 'assets', 'images')
+
+            if not os.path.exists(images_dir):
+                self.score['images']['score'] = 100 # No images is technically valid
+                self.score['images']['stats'] = {'total': 0, 'broken': 0, 'oversized': 0, 'total_size_mb': 0}
+                return
+
+            metas = self._scan_image_dir(images_dir)
+
+        issues = self.score['images']['issues']
+
+        if np is not None and metas:
+            # SIMD comparisons over one int64 array; issue strings are only
+            # built for the exceptional entries
+            sizes = np.fromiter((size for _, size in metas), dtype=np.int64, count=len(metas))
+            total = sizes.size
+            current_size = int(sizes.sum())
+
+            oversized_idx = np.nonzero(sizes > 1_500_000)[0] # > 1.5MB
+            broken_idx = np.nonzero(sizes < 100)[0] # Suspiciously small
+            oversized = int(oversized_idx.size)
+            broken = int(broken_idx.size)
+
+            for i in oversized_idx:
+                issues.append(f"Heavy image: {metas[i][0]} ({sizes[i]/1024/1024:.1f}MB)")
+            for i in broken_idx:
+                issues.append(f"Corrupt/Empty image: {metas[i][0]}")
+        else:
+            total = 0
+            broken = 0
+            oversized = 0
+            current_size = 0
+
+            for name, size in metas:
+                total += 1
+                current_size += size
+
+                if size > 1_500_000: # > 1.5MB
+                    oversized += 1
+                    issues.append(f"Heavy image: {name} ({size/1024/1024:.1f}MB)")
+
+                # Basic integrity check
+                if size < 100: # Suspiciously small
+                    broken += 1
+                    issues.append(f"Corrupt/Empty image: {name}")
         
         # Scoring
         if total == 0:
@@ -74,6 +131,18 @@ class QualityScorer:
             'total_size_mb': round(current_size / 1024 / 1024, 2)
         }
 
+    @staticmethod
+    def _scan_image_dir(images_dir):
+        """(name, size) pairs from disk, for callers without download metadata."""
+        metas = []
+        # DirEntry caches type and stat from the directory walk — no extra
+        # stat() syscalls per file like listdir+isfile+getsize
+        with os.scandir(images_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    metas.append((entry.name, entry.stat().st_size))
+        return metas
+
     async def check_css(self):
         """Analyze CSS assets."""
         css_dir = os.path.join(self.output_dir, 'css')
@@ -83,20 +152,16 @@ class QualityScorer:
             self.score['css']['stats'] = {'total': 0, 'broken': 0}
             return
             
-        total = 0
-        broken = 0
-        
-        for f in os.listdir(css_dir):
-            if not f.endswith('.css'): continue
-            path = os.path.join(css_dir, f)
-            total += 1
-            
-            async with aiofiles.open(path, 'r', errors='ignore') as file:
-                content = await file.read()
-                if '<html' in content.lower():
-                    broken += 1
-                    self.score['css']['issues'].append(f"Invalid CSS (contains HTML): {f}")
-                    
+        # Single scandir pass with the suffix filter inline — no listdir
+        # list plus a second filtering loop
+        with os.scandir(css_dir) as it:
+            paths = [e.path for e in it if e.is_file() and e.name.endswith('.css')]
+
+        # One thread hop for the whole batch instead of two aiofiles
+        # round-trips (open + read) per file
+        total, broken, issues = await asyncio.to_thread(self._scan_css_files, paths)
+        self.score['css']['issues'].extend(issues)
+
         if total == 0:
             score = 100
         else:
@@ -105,6 +170,20 @@ class QualityScorer:
         self.score['css']['score'] = int(score)
         self.score['css']['stats'] = {'total': total, 'broken': broken}
 
+    @staticmethod
+    def _scan_css_files(paths):
+        """Read and sanity-check a batch of CSS files (runs in one thread)."""
+        total = 0
+        broken = 0
+        issues = []
+        for path in paths:
+            total += 1
+            # Head-only sniff: no full read, no lowercase copy of the body
+            if _HTML_SNIFF_RE.search(_read_head(path)):
+                broken += 1
+                issues.append(f"Invalid CSS (contains HTML): {os.path.basename(path)}")
+        return total, broken, issues
+
     async def check_html(self):
         """Analyze index.html."""
         html_path = os.path.join(self.output_dir, 'index.html')
@@ -113,22 +192,23 @@ class QualityScorer:
             self.score['html']['issues'].append("Missing index.html")
             return
             
-        async with aiofiles.open(html_path, 'r', errors='ignore') as f:
-            content = await f.read()
-            
+        content = await asyncio.to_thread(_read_text, html_path)
+
+
         issues = []
         score = 100
-        
+
+        counts = Counter(m.group(0) for m in _HTML_SCAN_RE.finditer(content))
+
         # Check for broken links left
         # (Naive check: empty src/href)
-        broken_refs = content.count('src=""') + content.count('href=""')
+        broken_refs = counts['src=""'] + counts['href=""']
         if broken_refs > 0:
             issues.append(f"{broken_refs} empty resource references")
             score -= min(20, broken_refs * 2)
-            
+
         # Check for tracers
-        tracers = ['google-analytics', 'fbq(', 'gtag(']
-        found_tracers = sum(1 for t in tracers if t in content)
+        found_tracers = sum(1 for t in _TRACER_TOKENS if counts[t])
         if found_tracers > 0:
             issues.append(f"{found_tracers} tracking scripts detected")
             score -= found_tracers * 5
@@ -138,44 +218,52 @@ class QualityScorer:
 
     def calculate_overall_score(self):
         """Weighted average."""
-        weights = {'html': 0.4, 'css': 0.3, 'images': 0.3}
-        total = sum(self.score[k]['score'] * w for k, w in weights.items())
+        total = sum(self.score[k]['score'] * w for k, w in _WEIGHTS)
         self.score['overall'] = int(total)
 
     async def generate_report(self) -> str:
         """Generate markdown report."""
         s = self.score
-        
-        report = f"""# ✅ Quality Certification Report
+        # Bind the nested dicts once; each .get below was two dict lookups
+        # inside the f-string otherwise
+        html, css, images = s['html'], s['css'], s['images']
+        css_stats = css.get('stats', {})
+        img_stats = images.get('stats', {})
 
-## 🏆 Overall Quality Score: {s['overall']}/100
-
-### Breakdown
-- **HTML Structure**: {s['html']['score']}/100
-- **Stylesheets**: {s['css']['score']}/100
-- **Images & Assets**: {s['images']['score']}/100
-
-### 🔍 Detailed Inspection
-
-**HTML Issues**:
-{self._format_issues(s['html']['issues'])}
-
-**CSS Stats**:
-- Total Files: {s['css']['stats'].get('total', 0)}
-- Broken Files: {s['css']['stats'].get('broken', 0)}
-{self._format_issues(s['css']['issues'])}
-
-**Image Optimization**:
-- Total Images: {s['images']['stats'].get('total', 0)}
-- Total Size: {s['images']['stats'].get('total_size_mb', 0)} MB
-{self._format_issues(s['images']['issues'])}
-
----
-*Certified by Web Cloner Elite Quality Engine*
-"""
-        return report
+        # One join over prepared fragments instead of one big f-string
+        # re-parsed around every interpolation
+        return "\n".join([
+            "# ✅ Quality Certification Report",
+            "",
+            f"## 🏆 Overall Quality Score: {s['overall']}/100",
+            "",
+            "### Breakdown",
+            f"- **HTML Structure**: {html['score']}/100",
+            f"- **Stylesheets**: {css['score']}/100",
+            f"- **Images & Assets**: {images['score']}/100",
+            "",
+            "### 🔍 Detailed Inspection",
+            "",
+            "**HTML Issues**:",
+            self._format_issues(html['issues']),
+            "",
+            "**CSS Stats**:",
+            f"- Total Files: {css_stats.get('total', 0)}",
+            f"- Broken Files: {css_stats.get('broken', 0)}",
+            self._format_issues(css['issues']),
+            "",
+            "**Image Optimization**:",
+            f"- Total Images: {img_stats.get('total', 0)}",
+            f"- Total Size: {img_stats.get('total_size_mb', 0)} MB",
+            self._format_issues(images['issues']),
+            "",
+            "---",
+            "*Certified by Web Cloner Elite Quality Engine*",
+            "",
+        ])
 
     def _format_issues(self, issues):
         if not issues:
             return "_No significant issues found. ✅_"
-        return "\n".join([f"- ⚠️ {i}" for i in issues])
+        # Generator feeds join directly — no intermediate list
+        return "\n".join("- ⚠️ " + i for i in issues)
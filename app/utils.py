@@ -1,17 +1,46 @@
-import shutil
 import os
-import zipfile
+import shutil
+
+# Already-compressed formats: deflating them again wastes CPU and usually
+# grows the entry
+_STORED_EXTS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.woff', '.woff2')
+
 
+def _walk_entries(source_dir):
+    """Yield (abs_path, arcname) pairs for every file under source_dir."""
+    for root, _, files in os.walk(source_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            yield path, os.path.relpath(path, source_dir)
 
-def create_zip_archive(source_dir: str, output_filename: str) -> str:
-    """Creates a zip archive of the source directory with proper structure."""
+
+def create_zip_archive(source_dir: str, output_filename: str, entries=None) -> str:
+    """Creates a zip archive of the source directory with proper structure.
+
+    ``entries`` is an optional iterable of (abs_path, arcname) pairs — the
+    cloner already knows every file it wrote, which saves re-walking the
+    tree. When omitted, the directory is walked.
+    """
+    # Deferred so importing utils stays cheap for callers that never zip
+    import zipfile
     try:
-        # Remove .zip extension if present for make_archive
-        base_name = output_filename.replace('.zip', '')
-        
-        # Create archive
-        shutil.make_archive(base_name, 'zip', source_dir)
-        
+        # ISA-L's SIMD deflate speaks the same compressobj API as zlib and
+        # is several times faster at low levels; zipfile reaches zlib
+        # through its module-level reference, so rebinding it is enough
+        from isal import isal_zlib
+        zipfile.zlib = isal_zlib
+    except ImportError:
+        pass
+    try:
+        with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for path, arcname in (entries if entries is not None else _walk_entries(source_dir)):
+                if not os.path.isfile(path):
+                    continue
+                compress_type = (zipfile.ZIP_STORED
+                                 if arcname.lower().endswith(_STORED_EXTS)
+                                 else zipfile.ZIP_DEFLATED)
+                zf.write(path, arcname, compress_type=compress_type)
+
         return output_filename
     except Exception as e:
         print(f"Error creating zip: {e}")
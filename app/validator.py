@@ -3,9 +3,43 @@ Resource Validator Module
 Ensures downloaded content is legitimate and safe.
 """
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# HTML error pages masquerading as assets betray themselves in the head;
+# a bounded case-insensitive search beats lowercasing the whole body
+_HTML_SNIFF_RE = re.compile(rb'<!doctype|<html', re.IGNORECASE)
+
+# How far into a text asset the HTML sniff looks. Searches use pos/endpos
+# on the original buffer, so validation allocates nothing per call.
+_SNIFF_LIMIT = 4096
+
+# Magic bytes for jpg/png/gif/webp/ico in one alternation — a single DFA
+# step in C instead of a Python loop of startswith calls
+_MAGIC_RE = re.compile(b'^(?:\xff\xd8\xff|\x89PNG|GIF8[79]a|RIFF|\x00\x00\x01\x00)')
+
+# HTML documents masquerading as images: match only an HTML doctype or an
+# <html> tag, so an SVG's own <!DOCTYPE svg ...> prolog doesn't trip it
+_HTML_DOC_RE = re.compile(rb'<!doctype html|<html', re.IGNORECASE)
+
+# SVG check needs to be looser as it's text. The window must clear a full
+# XML prolog plus <!DOCTYPE svg PUBLIC ...> line (~140 bytes in editor
+# exports) before the <svg> root appears.
+_SVG_RE = re.compile(rb'<svg', re.IGNORECASE)
+
+# 256-entry table of first bytes any accepted image can start with: the
+# binary magics above, '<' for SVG, plus whitespace/BOM bytes that may
+# precede an SVG prolog. One indexed read rejects most garbage outright.
+_MAGIC_FIRST = bytes(
+    1 if b in {0xff, 0x89, ord('G'), ord('R'), 0x00, ord('<'), 0xef, 0x09, 0x0a, 0x0d, 0x20} else 0
+    for b in range(256)
+)
+
+# Any one of these tokens marks plausible CSS; the alternation finds the
+# first hit in a single linear pass instead of six separate substring scans
+_CSS_SYNTAX_RE = re.compile(rb'\{|@import|@media|@font-face|\bbody\b|color:')
+
 class ResourceValidator:
     """Validates that downloaded resources are legitimate."""
     
@@ -14,27 +48,22 @@ class ResourceValidator:
         """Verify that content is a real image and not an error page."""
         if not data:
             return False
-            
-        # Check for HTML disguised as image
-        if data.lstrip().startswith(b'<!DOCTYPE') or data.lstrip().startswith(b'<html'):
+
+        # First-byte reject: a single table read rules out most non-images
+        # before any regex runs
+        if not _MAGIC_FIRST[data[0]]:
             return False
-        
-        # Check magic bytes for common formats
-        valid_headers = {
-            b'\xff\xd8\xff': 'jpg',
-            b'\x89PNG': 'png',
-            b'GIF89a': 'gif',
-            b'GIF87a': 'gif',
-            b'<svg': 'svg',
-            b'RIFF': 'webp',
-            b'\x00\x00\x01\x00': 'ico'
-        }
-        
-        # SVG check needs to be looser as it's text
-        if b'<svg' in data[:100].lower():
+
+        # SVG first, since it's text and can start with whitespace, an XML
+        # prolog and a legitimate SVG doctype
+        if _SVG_RE.search(data, 0, 256):
             return True
-            
-        return any(data.startswith(h) for h in valid_headers.keys())
+
+        # Check for HTML disguised as image
+        if _HTML_DOC_RE.search(data, 0, 256):
+            return False
+
+        return _MAGIC_RE.match(data) is not None
     
     @staticmethod
     def is_valid_css(data: bytes) -> bool:
@@ -42,40 +71,22 @@ class ResourceValidator:
         if not data:
             return False
             
-        try:
-            text = data.decode('utf-8', errors='ignore').strip()
-            
-            # Should not be HTML
-            if text.lower().startswith('<!doctype') or '<html' in text.lower():
-                return False
-            
-            # Simple heuristic: CSS usually has braces or @rules
-            has_css_syntax = any([
-                '{' in text and '}' in text,
-                '@import' in text,
-                '@media' in text,
-                '@font-face' in text,
-                'body' in text,
-                'color:' in text
-            ])
-            
-            return has_css_syntax if len(text) > 20 else True # Allow small CSS snippets
-        except:
+        # Should not be HTML
+        if _HTML_SNIFF_RE.search(data, 0, _SNIFF_LIMIT):
             return False
+
+        if len(data) <= 20:
+            return True # Allow small CSS snippets
+
+        # Simple heuristic: CSS usually has braces or @rules. Scanned on the
+        # raw bytes, so no decoded copy of the whole response
+        return _CSS_SYNTAX_RE.search(data) is not None
     
     @staticmethod
     def is_valid_js(data: bytes) -> bool:
         """Verify that content is real JavaScript."""
         if not data:
             return False
-            
-        try:
-            text = data.decode('utf-8', errors='ignore').strip()
-            
-            # Should not be HTML
-            if text.lower().startswith('<!doctype') or '<html' in text.lower():
-                return False
-            
-            return True
-        except:
-            return False
+
+        # Should not be HTML; no decode needed for the sniff
+        return not _HTML_SNIFF_RE.search(data, 0, _SNIFF_LIMIT)